@@ -2,16 +2,65 @@
 
 #### Example - to be refined later
 
+import hashlib
+from collections import OrderedDict
+import pandas as pd
+from yahoo_finance_collector import YahooFinanceCollector
+from data_preprocessing_module import DataPreprocessor
+
 class StockDataAPI:
+    CACHE_SIZE = 128  # Max number of processed results kept in memory
+
     def __init__(self, api_key=None):
         self.collector = YahooFinanceCollector()
+        self.preprocessor = DataPreprocessor()
         self.api_key = api_key  # For future extensions with paid APIs
-        self._cache = {}  # Simple caching
-    
+        self._cache = OrderedDict()  # LRU cache of processed data keyed on input content
+
+    def _cache_key(self, symbol, data_type, data_dict):
+        """Build a cache key from the symbol, data type and a hash of the raw data"""
+        digest = hashlib.blake2b(digest_size=16)
+        for key in sorted(data_dict):
+            df = data_dict[key]
+            digest.update(key.encode())
+            digest.update(repr(df.columns.tolist()).encode())
+            digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return (symbol, data_type, digest.hexdigest())
+
     def get_stock_data(self, symbol, data_type="all"):
-        """Main interface method"""
-        pass
-    
+        """
+        Main interface method
+        data_type: "all", "fundamental" or "historical"
+        Returns processed data dictionary, or None if nothing could be collected
+        """
+        data_dict = {}
+        if data_type in ("all", "fundamental"):
+            fund_data = self.collector.get_fundamental_data(symbol)
+            data_dict.update({
+                key: df for key, df in fund_data.items()
+                if isinstance(df, pd.DataFrame) and not df.empty
+            })
+        if data_type in ("all", "historical"):
+            hist_data = self.collector.get_historical_data(symbol)
+            if not hist_data.empty:
+                data_dict['historical_1y_1d'] = hist_data
+
+        if not data_dict:
+            return None
+
+        # Skip preprocessing when the same data was already processed; callers get a
+        # shallow copy so changes to the returned dict don't leak into later hits
+        key = self._cache_key(symbol, data_type, data_dict)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return dict(self._cache[key])
+
+        processed = self.preprocessor.process_stock_data(data_dict)
+        self._cache[key] = processed
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return dict(processed)
+
     def bulk_download(self, symbols):
         """Batch processing method"""
-        pass
\ No newline at end of file
+        return {symbol: self.get_stock_data(symbol) for symbol in symbols}
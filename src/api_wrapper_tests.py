@@ -0,0 +1,46 @@
+import pandas as pd
+from api_wrapper import StockDataAPI
+
+class StubCollector:
+    """Collector returning whatever history it is given, with no fundamentals"""
+    def __init__(self, history):
+        self.history = history
+
+    def get_fundamental_data(self, symbol):
+        return {}
+
+    def get_historical_data(self, symbol):
+        return self.history
+
+class CountingPreprocessor:
+    """Preprocessor recording how many times it was run"""
+    def __init__(self):
+        self.calls = 0
+
+    def process_stock_data(self, data_dict):
+        self.calls += 1
+        return {'historical_1y_1d': data_dict['historical_1y_1d'], 'validation_results': {}}
+
+def make_history(close):
+    return pd.DataFrame({'Close': close}, index=pd.date_range('2024-01-01', periods=len(close), tz='Asia/Kolkata'))
+
+def test_processed_data_is_cached_by_content():
+    api = StockDataAPI()
+    api.collector = StubCollector(make_history([1.0, 2.0, 3.0]))
+    api.preprocessor = CountingPreprocessor()
+
+    first = api.get_stock_data("RELIANCE.NS", data_type="historical")
+    # Freshly downloaded but identical data is not processed again
+    api.collector.history = make_history([1.0, 2.0, 3.0])
+    second = api.get_stock_data("RELIANCE.NS", data_type="historical")
+    assert api.preprocessor.calls == 1
+    assert second['historical_1y_1d'] is first['historical_1y_1d']
+
+    # Changing the returned dict does not change what later hits get
+    second['extra'] = 'mutated'
+    assert 'extra' not in api.get_stock_data("RELIANCE.NS", data_type="historical")
+
+    # Changed content is processed again
+    api.collector.history = make_history([1.0, 2.0, 4.0])
+    api.get_stock_data("RELIANCE.NS", data_type="historical")
+    assert api.preprocessor.calls == 2
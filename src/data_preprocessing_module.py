@@ -2,11 +2,163 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional
 import logging
-from data_validator import DataValidator
+import bottleneck as bn
+from numba import njit
+from data_validator import DataValidator, columns_are_dates
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Copy-on-write lets the clean_* methods derive new frames from their inputs
+# without eagerly copying every column up front
+pd.set_option('mode.copy_on_write', True)
+
+
+def _pct_change(a: np.ndarray) -> np.ndarray:
+    """Percentage change between consecutive elements of a 1-D array"""
+    out = np.empty_like(a, dtype=np.float64)
+    if out.size == 0:
+        return out
+    out[0] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(a[1:], a[:-1], out=out[1:])
+    out[1:] -= 1
+    return out
+
+
+def _ffill(df: pd.DataFrame, axis: int = 0) -> pd.DataFrame:
+    """
+    Forward fill along the given axis.
+    Float-only frames are filled with a single bottleneck pass,
+    anything else falls back to pandas.
+    """
+    if df.empty or not all(dtype.kind == 'f' for dtype in df.dtypes):
+        return df.ffill(axis=axis)
+    filled = bn.push(df.to_numpy(dtype=np.float64, copy=False), axis=axis)
+    return pd.DataFrame(filled, index=df.index, columns=df.columns)
+
+
+def _to_float(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert a frame to float64.
+    Columns that can't be cast directly are coerced with pd.to_numeric,
+    turning unparseable values into NaN.
+    """
+    try:
+        return df.astype(np.float64)
+    except (TypeError, ValueError):
+        pass
+    
+    columns = []
+    for _, col in df.items():
+        try:
+            columns.append(col.astype(np.float64))
+        except (TypeError, ValueError):
+            columns.append(pd.to_numeric(col, errors='coerce').astype(np.float64))
+    return pd.concat(columns, axis=1)
+
+
+@njit(cache=True)
+def _rolling_ma_vol(close, volume, w50, w200, w20):
+    """
+    Single pass over Close/Volume computing returns and rolling indicators.
+    Windows containing a NaN yield NaN, matching pandas' rolling defaults.
+    Price-derived outputs keep the dtype of `close`; sums accumulate in float64.
+    Moving averages whose window is longer than the series are left all-NaN.
+    Returns (returns, ma_50, ma_200, volatility_20, volume_ma_20)
+    """
+    n = close.shape[0]
+    track50 = n >= w50
+    track200 = n >= w200
+    returns = np.empty(n, close.dtype)
+    ma_50 = np.empty(n, close.dtype)
+    ma_200 = np.empty(n, close.dtype)
+    volatility = np.empty(n, close.dtype)
+    volume_ma = np.empty(n, np.float64)
+    returns[:] = np.nan
+    ma_50[:] = np.nan
+    ma_200[:] = np.nan
+    volatility[:] = np.nan
+    volume_ma[:] = np.nan
+
+    # Running sums and counts of NaNs currently inside each window
+    s50 = 0.0
+    s200 = 0.0
+    r_sum = 0.0
+    r_sumsq = 0.0
+    v_sum = 0.0
+    nan50 = 0
+    nan200 = 0
+    r_nan = 0
+    v_nan = 0
+
+    for i in range(n):
+        c = close[i]
+        if i > 0:
+            returns[i] = c / close[i - 1] - 1.0
+        r = returns[i]
+        v = volume[i]
+
+        # Add the incoming observation to each window
+        if np.isnan(c):
+            nan50 += 1
+            nan200 += 1
+        elif track200:
+            s50 += c
+            s200 += c
+        elif track50:
+            s50 += c
+        if np.isnan(r):
+            r_nan += 1
+        else:
+            r_sum += r
+            r_sumsq += r * r
+        if np.isnan(v):
+            v_nan += 1
+        else:
+            v_sum += v
+
+        # Drop the observation leaving each window
+        if track50 and i >= w50:
+            old = close[i - w50]
+            if np.isnan(old):
+                nan50 -= 1
+            else:
+                s50 -= old
+        if track200 and i >= w200:
+            old = close[i - w200]
+            if np.isnan(old):
+                nan200 -= 1
+            else:
+                s200 -= old
+        if i >= w20:
+            old = returns[i - w20]
+            if np.isnan(old):
+                r_nan -= 1
+            else:
+                r_sum -= old
+                r_sumsq -= old * old
+            old = volume[i - w20]
+            if np.isnan(old):
+                v_nan -= 1
+            else:
+                v_sum -= old
+
+        if track50 and i >= w50 - 1 and nan50 == 0:
+            ma_50[i] = s50 / w50
+        if track200 and i >= w200 - 1 and nan200 == 0:
+            ma_200[i] = s200 / w200
+        if i >= w20 - 1:
+            if r_nan == 0 and w20 > 1:
+                mean = r_sum / w20
+                var = (r_sumsq - w20 * mean * mean) / (w20 - 1)
+                volatility[i] = np.sqrt(var) if var > 0.0 else 0.0
+            if v_nan == 0:
+                volume_ma[i] = v_sum / w20
+
+    return returns, ma_50, ma_200, volatility, volume_ma
+
+
 class DataPreprocessor:
     def __init__(self):
         self.validator = DataValidator()
@@ -20,56 +172,73 @@ class DataPreprocessor:
         if df.empty:
             return df
             
-        df = df.copy()
+        # Handle missing values: no trades means zero volume,
+        # every other column carries its previous value forward
+        volume = df['Volume'].to_numpy(dtype=np.float64, copy=True)
+        np.nan_to_num(volume, copy=False, nan=0.0)
+        df = df.assign(Volume=volume)
+        other_cols = df.columns.drop('Volume')
+        df[other_cols] = _ffill(df[other_cols])
         
-        # Handle missing values
-        df['Volume'] = df['Volume'].fillna(0)
-        df = df.ffill()
+        # Prices fit comfortably in float32, which halves the bytes
+        # every indicator pass has to read
+        price_cols = ['Open', 'High', 'Low', 'Close']
+        df[price_cols] = df[price_cols].astype(np.float32)
         
         # Remove duplicate indices
         df = df[~df.index.duplicated(keep='first')]
         
-        # Calculate returns
-        df['Returns'] = df['Close'].pct_change()
-        
-        # Add technical indicators
-        # Moving averages
-        df['MA_50'] = df['Close'].rolling(window=50).mean()
-        df['MA_200'] = df['Close'].rolling(window=200).mean()
-        
-        # Volatility (20-day)
-        df['Volatility_20D'] = df['Returns'].rolling(window=20).std()
+        # Calculate returns and technical indicators in one pass:
+        # moving averages, 20-day volatility and volume moving average
+        close = df['Close'].to_numpy(copy=False)
+        n = len(close)
+        if n < 20:
+            # Too short to fill even the 20-day windows: only returns
+            # carry information, so skip the rolling kernel altogether
+            returns = _pct_change(close).astype(close.dtype, copy=False)
+            ma_50 = np.full(n, np.nan, dtype=close.dtype)
+            ma_200 = np.full(n, np.nan, dtype=close.dtype)
+            volatility = np.full(n, np.nan, dtype=close.dtype)
+            volume_ma = np.full(n, np.nan)
+        else:
+            volume = df['Volume'].to_numpy(dtype=np.float64, copy=False)
+            returns, ma_50, ma_200, volatility, volume_ma = _rolling_ma_vol(close, volume, 50, 200, 20)
         
-        # Trading volume indicators
-        df['Volume_MA_20'] = df['Volume'].rolling(window=20).mean()
-        
-        return df
+        return df.assign(
+            Returns=returns,
+            MA_50=ma_50,
+            MA_200=ma_200,
+            Volatility_20D=volatility,
+            Volume_MA_20=volume_ma
+        )
     
     def clean_financial_statement(self, df: pd.DataFrame, statement_type: str) -> pd.DataFrame:
         """
         Clean financial statements (balance sheet, income stmt, cash flow)
-        - Transpose dates from columns to index if needed
+        - Returns metrics in index, dates in columns
         - Handle missing values
         - Convert values to proper numeric format
         """
         if df.empty:
             return df
             
-        df = df.copy()
-        
-        # Transpose if dates are in columns
-        if all(isinstance(col, pd.Timestamp) for col in df.columns):
-            df = df.transpose()
+        # Work along whichever axis holds the dates; only dates found
+        # in the index need a transpose to end up as columns
+        dates_in_index = isinstance(df.index, pd.DatetimeIndex)
+        date_axis = 1 if columns_are_dates(df.columns) else 0
         
         # Convert string values to numeric
-        df = df.apply(pd.to_numeric, errors='coerce')
+        df = _to_float(df)
         
         # Handle missing values based on statement type
         if statement_type == 'balance_sheet':
-            df = df.ffill()  # Use previous period's values
+            df = _ffill(df, axis=date_axis)  # Use previous period's values
         elif statement_type in ['income_statement', 'cash_flow']:
             df = df.fillna(0)  # Use 0 for missing flow values
         
+        if dates_in_index and date_axis == 0:
+            df = df.transpose()
+        
         return df
     
     def clean_info_data(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -77,19 +246,16 @@ class DataPreprocessor:
         if df.empty:
             return df
             
-        df = df.copy()
-        
         # Convert numeric columns to proper type
         numeric_columns = [
             'marketCap', 'trailingPE', 'forwardPE', 'priceToBook',
             'returnOnEquity', 'returnOnAssets', 'totalRevenue'
         ]
         
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        present = [col for col in numeric_columns if col in df.columns]
+        converted = df[present].apply(pd.to_numeric, errors='coerce')
         
-        return df
+        return df.assign(**converted)
     
     def calculate_financial_ratios(self, data_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
         """Calculate financial ratios based on available data"""
@@ -104,26 +270,35 @@ class DataPreprocessor:
             if dates is None:
                 return pd.DataFrame()
                 
-            ratios = pd.DataFrame(index=dates)
-            
             bs = data_dict.get('balance_sheet')
             is_stmt = data_dict.get('income_statement')
             cf = data_dict.get('cash_flow')
             
+            def on_dates(values: np.ndarray, columns: pd.Index):
+                # Raw arrays can be used as-is when the statement shares the ratio dates
+                return values if columns.equals(dates) else pd.Series(values, index=columns)
+            
+            ratios = {}
+            
             if bs is not None:
+                rows = bs.reindex(['Total Debt', 'Net Debt', 'Tangible Book Value']).to_numpy(dtype=np.float64)
+                
                 if all(x in bs.index for x in ['Total Debt', 'Net Debt']):
-                    ratios['Debt_Ratio'] = bs.loc['Total Debt'] / bs.loc['Net Debt']
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        ratios['Debt_Ratio'] = on_dates(rows[0] / rows[1], bs.columns)
                     
                 if 'Tangible Book Value' in bs.index:
-                    ratios['Tangible_Book_Value_Growth'] = bs.loc['Tangible Book Value'].pct_change()
+                    ratios['Tangible_Book_Value_Growth'] = on_dates(_pct_change(rows[2]), bs.columns)
             
             if is_stmt is not None and 'Normalized EBITDA' in is_stmt.index:
-                ratios['EBITDA_Growth'] = is_stmt.loc['Normalized EBITDA'].pct_change()
+                ebitda = is_stmt.loc['Normalized EBITDA'].to_numpy(dtype=np.float64)
+                ratios['EBITDA_Growth'] = on_dates(_pct_change(ebitda), is_stmt.columns)
                 
             if cf is not None and 'Free Cash Flow' in cf.index:
-                ratios['FCF_Growth'] = cf.loc['Free Cash Flow'].pct_change()
+                fcf = cf.loc['Free Cash Flow'].to_numpy(dtype=np.float64)
+                ratios['FCF_Growth'] = on_dates(_pct_change(fcf), cf.columns)
                 
-            return ratios
+            return pd.DataFrame(ratios, index=dates)
                 
         except Exception as e:
             logger.error(f"Error calculating ratios: {str(e)}")
@@ -144,24 +319,12 @@ class DataPreprocessor:
                 if 'historical' in key:
                     processed_data[key] = self.clean_historical_data(data_dict[key])
             
-            # Process financial statements - ensure dates stay as columns
-            if 'balance_sheet' in data_dict:
-                df = self.clean_financial_statement(data_dict['balance_sheet'], 'balance_sheet')
-                if df.index.dtype == 'datetime64[ns]':  # If dates moved to index
-                    df = df.transpose()  # Move them back to columns
-                processed_data['balance_sheet'] = df
-                
-            if 'income_statement' in data_dict:
-                df = self.clean_financial_statement(data_dict['income_statement'], 'income_statement')
-                if df.index.dtype == 'datetime64[ns]':
-                    df = df.transpose()
-                processed_data['income_statement'] = df
-                
-            if 'cash_flow' in data_dict:
-                df = self.clean_financial_statement(data_dict['cash_flow'], 'cash_flow')
-                if df.index.dtype == 'datetime64[ns]':
-                    df = df.transpose()
-                processed_data['cash_flow'] = df
+            # Process financial statements - dates stay as columns
+            for statement_type in ['balance_sheet', 'income_statement', 'cash_flow']:
+                if statement_type in data_dict:
+                    processed_data[statement_type] = self.clean_financial_statement(
+                        data_dict[statement_type], statement_type
+                    )
             
             # Calculate financial ratios only if we have the required data
             ratios = self.calculate_financial_ratios(processed_data)
@@ -197,10 +360,13 @@ class DataPreprocessor:
             
             # Add financial ratios
             if 'financial_ratios' in data_dict:
-                ratios = data_dict['financial_ratios']
-                # Forward fill ratios to align with daily data
-                for col in ratios.columns:
-                    base_df[f'ratio_{col}'] = ratios[col].reindex(base_df.index, method='ffill')
+                ratios = data_dict['financial_ratios'].sort_index()
+                # Forward fill ratios to align with daily data: one indexer
+                # into the ratio dates serves every ratio column
+                indexer = ratios.index.get_indexer(base_df.index, method='ffill')
+                values = ratios.to_numpy(dtype=np.float64).take(indexer, axis=0)
+                values[indexer == -1] = np.nan
+                base_df[[f'ratio_{col}' for col in ratios.columns]] = values
             
             return base_df
             
@@ -63,7 +63,7 @@ def test_financial_statement_cleaning(sample_financial_data):
         'balance_sheet'
     )
     assert cleaned_bs is not None
-    assert isinstance(cleaned_bs.index[0], pd.Timestamp)  # Dates should be in index after transpose
+    assert isinstance(cleaned_bs.columns[0], pd.Timestamp)  # Dates should stay in columns
     
     # Test income statement cleaning
     cleaned_is = preprocessor.clean_financial_statement(
@@ -123,4 +123,111 @@ def test_process_stock_data(sample_historical_data, sample_financial_data):
         print("Available keys in processed data:", processed.keys())
         print("\nBalance Sheet columns:", processed['balance_sheet'].index.tolist())
         print("\nIncome Statement columns:", processed['income_statement'].index.tolist())
-        assert False, "financial_ratios not found in processed data"
\ No newline at end of file
+        assert False, "financial_ratios not found in processed data"
+
+def test_technical_indicators_match_pandas_rolling():
+    rng = np.random.default_rng(0)
+    n = 260
+    close = 1000 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    volume = rng.integers(1e6, 1e7, n).astype(float)
+    volume[5] = np.nan
+    df = pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': volume, 'Dividends': 0.0, 'Stock Splits': 0.0
+    }, index=pd.date_range('2023-01-01', periods=n))
+
+    preprocessor = DataPreprocessor()
+    cleaned = preprocessor.clean_historical_data(df)
+
+    assert cleaned['Close'].dtype == np.float32
+
+    expected_close = df['Close']
+    expected_returns = expected_close.pct_change()
+    expected_volume = df['Volume'].fillna(0)
+    compare = dict(check_names=False, check_dtype=False, rtol=1e-4, atol=1e-6)  # float32 prices
+    pd.testing.assert_series_equal(cleaned['Returns'], expected_returns, **compare)
+    pd.testing.assert_series_equal(cleaned['MA_50'], expected_close.rolling(50).mean(), **compare)
+    pd.testing.assert_series_equal(cleaned['MA_200'], expected_close.rolling(200).mean(), **compare)
+    pd.testing.assert_series_equal(cleaned['Volatility_20D'], expected_returns.rolling(20).std(), **compare)
+    pd.testing.assert_series_equal(cleaned['Volume_MA_20'], expected_volume.rolling(20).mean(), **compare)
+
+
+def test_financial_ratio_growth_matches_pct_change(sample_financial_data):
+    preprocessor = DataPreprocessor()
+    ratios = preprocessor.calculate_financial_ratios(sample_financial_data)
+
+    expected = sample_financial_data['income_statement'].loc['Normalized EBITDA'].pct_change()
+    np.testing.assert_allclose(ratios['EBITDA_Growth'].to_numpy(), expected.to_numpy())
+
+
+def test_balance_sheet_forward_fill(sample_financial_data):
+    preprocessor = DataPreprocessor()
+    bs = sample_financial_data['balance_sheet'].copy()
+    bs.iloc[0, 1] = np.nan
+
+    cleaned_bs = preprocessor.clean_financial_statement(bs, 'balance_sheet')
+    expected = bs.apply(pd.to_numeric, errors='coerce').ffill(axis=1)
+    pd.testing.assert_frame_equal(cleaned_bs, expected)
+
+
+def test_cleaning_leaves_input_unchanged(sample_historical_data):
+    preprocessor = DataPreprocessor()
+    original = sample_historical_data.copy()
+
+    preprocessor.clean_historical_data(sample_historical_data)
+    pd.testing.assert_frame_equal(sample_historical_data, original)
+
+    info = pd.DataFrame({'marketCap': ['1.9e13'], 'trailingPE': ['25.3'], 'sector': ['Energy']})
+    cleaned_info = preprocessor.clean_info_data(info)
+    assert cleaned_info['marketCap'].dtype == np.float64
+    assert info['marketCap'].dtype == object
+
+
+def test_financial_statement_dates_in_index(sample_financial_data):
+    preprocessor = DataPreprocessor()
+    bs = sample_financial_data['balance_sheet']
+
+    cleaned_bs = preprocessor.clean_financial_statement(bs.transpose(), 'balance_sheet')
+    pd.testing.assert_frame_equal(cleaned_bs, bs)
+
+
+def test_combine_all_metrics(sample_financial_data):
+    preprocessor = DataPreprocessor()
+    ratios = preprocessor.calculate_financial_ratios(sample_financial_data)
+    daily = pd.DataFrame(
+        {'Close': [1.0, 2.0, 3.0]},
+        index=pd.to_datetime(['2021-01-01', '2022-06-30', '2024-04-01'])
+    )
+
+    combined = preprocessor.combine_all_metrics({
+        'historical_1y_1d': daily,
+        'financial_ratios': ratios
+    })
+
+    assert np.isnan(combined['ratio_Debt_Ratio'].iloc[0])  # Before the first statement
+    assert combined['ratio_Debt_Ratio'].iloc[1] == ratios.loc['2022-03-31', 'Debt_Ratio']
+    assert combined['ratio_Debt_Ratio'].iloc[2] == ratios.loc['2024-03-31', 'Debt_Ratio']
+
+
+def test_financial_statement_numeric_coercion(sample_financial_data):
+    preprocessor = DataPreprocessor()
+    cf = sample_financial_data['cash_flow'].astype(object)
+    cf.iloc[0, 1] = 'n/a'
+    cf.iloc[0, 2] = '1.05e11'
+
+    cleaned_cf = preprocessor.clean_financial_statement(cf, 'cash_flow')
+
+    assert (cleaned_cf.dtypes == np.float64).all()
+    assert cleaned_cf.iloc[0, 1] == 0  # Unparseable flow value treated as missing
+    assert cleaned_cf.iloc[0, 2] == 1.05e11
+    assert cleaned_cf.columns.equals(cf.columns)
+
+
+def test_short_series_indicators(sample_historical_data):
+    preprocessor = DataPreprocessor()
+    cleaned = preprocessor.clean_historical_data(sample_historical_data)
+
+    expected_returns = sample_historical_data['Close'].astype(np.float32).pct_change()
+    np.testing.assert_allclose(cleaned['Returns'].to_numpy(), expected_returns.to_numpy(), rtol=1e-6)
+    for col in ['MA_50', 'MA_200', 'Volatility_20D', 'Volume_MA_20']:
+        assert cleaned[col].isna().all()
@@ -2,18 +2,37 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def columns_are_dates(columns: pd.Index) -> bool:
+    """Check whether an Index holds dates from its dtype, without visiting each label"""
+    return isinstance(columns, pd.DatetimeIndex) or columns.dtype.kind == 'M'
+
+def _null_counts(df: pd.DataFrame) -> Dict:
+    """
+    Count missing values per column, keeping only columns that have any.
+    Numeric frames are checked with one np.isnan pass over the raw ndarray.
+    Columns are keyed by their label as a string (dates become 'YYYY-MM-DD HH:MM:SS').
+    """
+    if all(dtype.kind in 'fiub' for dtype in df.dtypes):
+        nan_mask = np.isnan(df.to_numpy(dtype=np.float64))
+    else:
+        nan_mask = df.isna().to_numpy()
+    null_counts = nan_mask.sum(axis=0)
+    return {str(df.columns[k]): int(null_counts[k]) for k in np.flatnonzero(null_counts)}
+
 class DataValidator:
     def __init__(self):
-        # Expected metrics for different data types
+        # Expected metrics for different data types, frozen once so each
+        # validation only has to diff them against the frame's labels
         self.expected_columns = {
-            'historical': ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits'],
-            'balance_sheet': ['Net Debt', 'Total Debt', 'Tangible Book Value', 'Ordinary Shares Number'],
-            'income_statement': ['Tax Rate For Calcs', 'Normalized EBITDA'],
-            'cash_flow': ['Free Cash Flow', 'Repayment Of Debt', 'Issuance Of Debt', 'Capital Expenditure']
+            'historical': frozenset(['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']),
+            'balance_sheet': frozenset(['Net Debt', 'Total Debt', 'Tangible Book Value', 'Ordinary Shares Number']),
+            'income_statement': frozenset(['Tax Rate For Calcs', 'Normalized EBITDA']),
+            'cash_flow': frozenset(['Free Cash Flow', 'Repayment Of Debt', 'Issuance Of Debt', 'Capital Expenditure'])
         }
         
         # Define acceptable ranges for different metrics
@@ -35,36 +54,36 @@ class DataValidator:
             issues['invalid_index'] = "Index is not DatetimeIndex"
         
         # Check for required columns
-        missing_cols = set(self.expected_columns['historical']) - set(df.columns)
+        missing_cols = self.expected_columns['historical'].difference(df.columns)
         if missing_cols:
             issues['missing_columns'] = list(missing_cols)
 
         # Check for null values
-        null_counts = df.isnull().sum()
-        if null_counts.any():
-            issues['null_values'] = null_counts[null_counts > 0].to_dict()
+        null_counts = _null_counts(df)
+        if null_counts:
+            issues['null_values'] = null_counts
 
         # Check for price anomalies
-        for col in ['Open', 'High', 'Low', 'Close']:
-            if col in df.columns:
-                anomalies = df[
-                    (df[col] < self.value_ranges['price'][0]) | 
-                    (df[col] > self.value_ranges['price'][1])
-                ]
-                if not anomalies.empty:
-                    issues[f'{col}_anomalies'] = anomalies.index.tolist()
+        price_cols = [col for col in ['Open', 'High', 'Low', 'Close'] if col in df.columns]
+        if price_cols:
+            prices = df[price_cols].to_numpy(dtype=np.float64)
+            price_min, price_max = self.value_ranges['price']
+            out_of_range = (prices < price_min) | (prices > price_max)
+            for k in np.flatnonzero(out_of_range.any(axis=0)):
+                rows = np.flatnonzero(out_of_range[:, k])
+                issues[f'{price_cols[k]}_anomalies'] = df.index.take(rows).tolist()
 
         # Check price consistency
-        if all(col in df.columns for col in ['High', 'Low', 'Open', 'Close']):
-            inconsistent = df[
-                (df['High'] < df['Low']) | 
-                (df['High'] < df['Open']) | 
-                (df['High'] < df['Close']) |
-                (df['Low'] > df['Open']) | 
-                (df['Low'] > df['Close'])
-            ]
-            if not inconsistent.empty:
-                issues['price_inconsistencies'] = inconsistent.index.tolist()
+        if len(price_cols) == 4:
+            open_, high, low, close = (prices[:, price_cols.index(col)] for col in ['Open', 'High', 'Low', 'Close'])
+            # High must be the largest and Low the smallest of the four prices;
+            # fmax/fmin skip NaNs so a single missing price doesn't mask the rest
+            inconsistent = (
+                (high < np.fmax(np.fmax(open_, close), low)) |
+                (low > np.fmin(np.fmin(open_, close), high))
+            )
+            if inconsistent.any():
+                issues['price_inconsistencies'] = df.index.take(np.flatnonzero(inconsistent)).tolist()
 
         # Check volume
         if 'Volume' in df.columns:
@@ -85,21 +104,22 @@ class DataValidator:
         issues = {}
         
         # Check if columns are dates
-        non_date_cols = [col for col in df.columns 
-                        if not isinstance(col, pd.Timestamp)]
-        if non_date_cols:
-            issues['non_date_columns'] = non_date_cols
+        if not columns_are_dates(df.columns):
+            non_date_cols = [col for col in df.columns 
+                            if not isinstance(col, pd.Timestamp)]
+            if non_date_cols:
+                issues['non_date_columns'] = non_date_cols
         
         # Check for required metrics in index
         if data_type in self.expected_columns:
-            missing_metrics = set(self.expected_columns[data_type]) - set(df.index)
+            missing_metrics = self.expected_columns[data_type].difference(df.index)
             if missing_metrics:
                 issues['missing_metrics'] = list(missing_metrics)
 
         # Check for null values
-        null_counts = df.isnull().sum()
-        if null_counts.any():
-            issues['null_values'] = null_counts[null_counts > 0].to_dict()
+        null_counts = _null_counts(df)
+        if null_counts:
+            issues['null_values'] = null_counts
 
         # Data type specific validations
         if data_type == 'balance_sheet':
@@ -125,10 +145,12 @@ class DataValidator:
 
         return len(issues) == 0, issues
 
-    def validate_data_freshness(self, df: pd.DataFrame, max_age_days: int = 90) -> Tuple[bool, str]:
+    def validate_data_freshness(self, df: pd.DataFrame, max_age_days: int = 90,
+                                now: Optional[pd.Timestamp] = None) -> Tuple[bool, str]:
         """
         Check if the data is recent enough.
         Handles both DatetimeIndex and date columns.
+        `now` lets batch callers share one reference time across frames.
         """
         if df.empty:
             return False, "Empty DataFrame"
@@ -136,17 +158,23 @@ class DataValidator:
         try:
             # Get latest date based on data structure
             if isinstance(df.index, pd.DatetimeIndex):
-                latest_date = df.index.max()
+                # Sorted indexes (the usual case) have the latest date last
+                if df.index.is_monotonic_increasing:
+                    latest_date = df.index[-1]
+                else:
+                    latest_date = df.index.max()
                 if latest_date.tz is not None:
                     latest_date = latest_date.tz_localize(None)  # Remove timezone
             
             
-            elif all(isinstance(col, pd.Timestamp) for col in df.columns):
-                latest_date = max(df.columns)
+            elif columns_are_dates(df.columns):
+                latest_date = df.columns.max()
             else:
                 return False, "No valid dates found"
             
-            age = (pd.Timestamp.now() - latest_date).days
+            if now is None:
+                now = pd.Timestamp.now()
+            age = (now - latest_date).days
             if age > max_age_days:
                 return False, f"Data is {age} days old (max allowed: {max_age_days})"
             return True, "Data is fresh"
@@ -154,39 +182,49 @@ class DataValidator:
         except Exception as e:
             return False, f"Error checking data freshness: {str(e)}"
 
+    def _validate_one(self, data_type: str, df: pd.DataFrame, now: pd.Timestamp) -> Dict:
+        """Run the validations matching a single data type"""
+        results = {}
+        
+        # Skip empty DataFrames
+        if df.empty:
+            results['status'] = False
+            results['issues'] = {'error': 'Empty DataFrame'}
+            return results
+            
+        try:
+            # Run appropriate validation based on data type
+            if 'historical' in data_type.lower():
+                results['status'], results['issues'] = self.validate_historical_data(df)
+            else:
+                results['status'], results['issues'] = self.validate_fundamental_data(data_type, df)
+            
+            # Check data freshness
+            fresh_status, fresh_msg = self.validate_data_freshness(df, now=now)
+            results['freshness'] = {'status': fresh_status, 'message': fresh_msg}
+            
+        except Exception as e:
+            results['status'] = False
+            results['issues'] = {'error': str(e)}
+            logger.error(f"Error validating {data_type}: {str(e)}")
+        
+        return results
+
     def run_all_validations(self, data_dict: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
         """
         Run all validations on a dictionary of DataFrames.
         Returns validation results for each data type.
+        DataFrames are validated concurrently; results keep the input order.
         """
-        validation_results = {}
+        if not data_dict:
+            return {}
         
-        for data_type, df in data_dict.items():
-            results = {}
-            
-            # Skip empty DataFrames
-            if df.empty:
-                results['status'] = False
-                results['issues'] = {'error': 'Empty DataFrame'}
-                validation_results[data_type] = results
-                continue
-                
-            try:
-                # Run appropriate validation based on data type
-                if 'historical' in data_type.lower():
-                    results['status'], results['issues'] = self.validate_historical_data(df)
-                else:
-                    results['status'], results['issues'] = self.validate_fundamental_data(data_type, df)
-                
-                # Check data freshness
-                fresh_status, fresh_msg = self.validate_data_freshness(df)
-                results['freshness'] = {'status': fresh_status, 'message': fresh_msg}
-                
-            except Exception as e:
-                results['status'] = False
-                results['issues'] = {'error': str(e)}
-                logger.error(f"Error validating {data_type}: {str(e)}")
-            
-            validation_results[data_type] = results
+        now = pd.Timestamp.now()
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(data_dict))) as executor:
+            futures = {
+                data_type: executor.submit(self._validate_one, data_type, df, now)
+                for data_type, df in data_dict.items()
+            }
             
-        return validation_results
\ No newline at end of file
+        return {data_type: future.result() for data_type, future in futures.items()}
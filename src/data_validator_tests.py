@@ -0,0 +1,119 @@
+import pytest
+import pandas as pd
+import numpy as np
+from data_validator import DataValidator
+
+@pytest.fixture
+def sample_historical_data():
+    return pd.DataFrame({
+        'Open': [1282.27, 1286.14, 1296.72, 1290.00],
+        'High': [1291.16, 1297.16, 1298.16, 1295.00],
+        'Low': [1277.85, 1284.68, 1280.93, 1285.00],
+        'Close': [1284.68, 1293.96, 1283.73, 1292.00],
+        'Volume': [9204156, 8500000, 10864584, 9100000],
+        'Dividends': [0.0, 0.0, 0.0, 0.0],
+        'Stock Splits': [0.0, 0.0, 0.0, 0.0]
+    }, index=pd.date_range('2023-12-27', periods=4))
+
+def test_valid_historical_data(sample_historical_data):
+    validator = DataValidator()
+    status, issues = validator.validate_historical_data(sample_historical_data)
+
+    assert status
+    assert issues == {}
+
+def test_price_anomalies(sample_historical_data):
+    validator = DataValidator()
+    df = sample_historical_data.copy()
+    df.loc[df.index[1], 'Close'] = -1.0
+    df.loc[df.index[3], 'Open'] = 2e6
+
+    status, issues = validator.validate_historical_data(df)
+
+    assert not status
+    assert issues['Close_anomalies'] == [df.index[1]]
+    assert issues['Open_anomalies'] == [df.index[3]]
+    assert 'High_anomalies' not in issues
+
+def test_price_inconsistencies(sample_historical_data):
+    validator = DataValidator()
+    df = sample_historical_data.copy()
+    df.loc[df.index[2], 'High'] = 1270.0  # Below Low, Open and Close
+
+    status, issues = validator.validate_historical_data(df)
+
+    assert not status
+    assert issues['price_inconsistencies'] == [df.index[2]]
+
+def test_fundamental_data_columns():
+    validator = DataValidator()
+    dates = [pd.Timestamp('2024-03-31'), pd.Timestamp('2023-03-31')]
+    df = pd.DataFrame({
+        dates[0]: [1.76e12, 0.25],
+        dates[1]: [1.55e12, 0.25]
+    }, index=['Normalized EBITDA', 'Tax Rate For Calcs'])
+
+    status, issues = validator.validate_fundamental_data('income_statement', df)
+    assert status
+
+    df['TTM'] = [1.80e12, 0.25]
+    status, issues = validator.validate_fundamental_data('income_statement', df)
+    assert not status
+    assert issues['non_date_columns'] == ['TTM']
+
+def test_data_freshness(sample_historical_data):
+    validator = DataValidator()
+    now = pd.Timestamp('2024-01-15')
+
+    status, message = validator.validate_data_freshness(sample_historical_data, now=now)
+    assert status
+
+    status, message = validator.validate_data_freshness(
+        sample_historical_data, now=now + pd.Timedelta(days=120)
+    )
+    assert not status
+    assert message == "Data is 136 days old (max allowed: 90)"
+
+def test_null_values(sample_historical_data):
+    validator = DataValidator()
+    df = sample_historical_data.copy()
+    df.loc[df.index[0], 'Volume'] = np.nan
+    df.loc[df.index[1:3], 'Close'] = np.nan
+
+    status, issues = validator.validate_historical_data(df)
+
+    assert not status
+    assert issues['null_values'] == {'Close': 2, 'Volume': 1}
+
+def test_run_all_validations(sample_historical_data):
+    validator = DataValidator()
+    data_dict = {
+        'historical_1y_1d': sample_historical_data,
+        'balance_sheet': pd.DataFrame(),
+    }
+
+    results = validator.run_all_validations(data_dict)
+
+    assert list(results) == ['historical_1y_1d', 'balance_sheet']
+    assert results['historical_1y_1d']['status']
+    assert 'freshness' in results['historical_1y_1d']
+    assert results['balance_sheet'] == {'status': False, 'issues': {'error': 'Empty DataFrame'}}
+
+def test_price_inconsistencies_with_missing_prices(sample_historical_data):
+    validator = DataValidator()
+    df = sample_historical_data.copy()
+    df.loc[df.index[0], 'Open'] = np.nan
+    df.loc[df.index[0], 'Low'] = 1300.0  # Above High and Close
+
+    status, issues = validator.validate_historical_data(df)
+
+    assert issues['price_inconsistencies'] == [df.index[0]]
+
+def test_missing_columns(sample_historical_data):
+    validator = DataValidator()
+    df = sample_historical_data.drop(columns=['Dividends', 'Stock Splits'])
+
+    status, issues = validator.validate_historical_data(df)
+
+    assert not status
+    assert sorted(issues['missing_columns']) == ['Dividends', 'Stock Splits']
@@ -1,26 +1,43 @@
 import pandas as pd
 import os
-from glob import glob
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+
+def read_file(file):
+    """Read a parquet file, returning the error instead of raising it"""
+    try:
+        return pd.read_parquet(file, memory_map=True)
+    except Exception as e:
+        return e
+
 
 # Find the most recent data directory
 data_dir = "../data"  # Adjust if needed
-timestamp_dirs = glob(os.path.join(data_dir, "*"))
+latest_dir = None
 
-# Sort directories by name (since they're named with timestamps)
-latest_dir = sorted(timestamp_dirs)[-1] if timestamp_dirs else None
+# Directories are named with timestamps, so the latest one has the largest name
+if os.path.isdir(data_dir):
+    with os.scandir(data_dir) as entries:
+        latest = max((e for e in entries if e.is_dir()), key=lambda e: e.name, default=None)
+    latest_dir = latest.path if latest else None
 
 if latest_dir:
     print(f"Examining data from directory: {latest_dir}")
     
     # Find all RELIANCE files
-    reliance_files = glob(os.path.join(latest_dir, "RELIANCE*"))
+    with os.scandir(latest_dir) as entries:
+        reliance_files = [e.path for e in entries if e.name.startswith("RELIANCE")]
     print("reliance_files:",reliance_files)
-    # Read and examine each file
-    for file in reliance_files:
+    # Read all files concurrently, then examine them in order
+    with ThreadPoolExecutor() as executor:
+        frames = list(executor.map(read_file, reliance_files))
+    
+    for file, df in zip(reliance_files, frames):
         print(f"\nExamining file: {os.path.basename(file)}")
         try:
-            df = pd.read_parquet(file)
+            if isinstance(df, Exception):
+                raise df
             
             # Handle both DataFrame and Series
             if isinstance(df, (pd.DataFrame, pd.Series)):
@@ -1,186 +1,284 @@
+import hashlib
+import weakref
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 from typing import Dict, List
+from numba import njit, prange
+
+# Financial statement rows used by the feature kernel. They are extracted once
+# into a NumPy array (rows x years, latest year first) in this order
+ROWS = [
+    'Net Income', 'Total Revenue', 'Cost Of Revenue', 'Current Assets',
+    'Current Liabilities', 'End Cash Position', 'Total Assets', 'Total Debt',
+    'Total Equity Gross Minority Interest', 'Operating Income', 'Working Capital',
+    'Net Tangible Assets', 'Operating Cash Flow', 'Capital Expenditure',
+    'Free Cash Flow', 'Total Capitalization', 'Retained Earnings', 'Diluted EPS'
+]
+(
+    IDX_NET_INCOME, IDX_TOTAL_REVENUE, IDX_COST_OF_REVENUE, IDX_CURRENT_ASSETS,
+    IDX_CURRENT_LIABILITIES, IDX_END_CASH_POSITION, IDX_TOTAL_ASSETS, IDX_TOTAL_DEBT,
+    IDX_TOTAL_EQUITY, IDX_OPERATING_INCOME, IDX_WORKING_CAPITAL,
+    IDX_NET_TANGIBLE_ASSETS, IDX_OPERATING_CASH_FLOW, IDX_CAPITAL_EXPENDITURE,
+    IDX_FREE_CASH_FLOW, IDX_TOTAL_CAPITALIZATION, IDX_RETAINED_EARNINGS, IDX_DILUTED_EPS
+) = range(len(ROWS))
+
+# Features computed for the current year and as a 3-year average
+BASIC_RATIOS = [
+    'net_profit_margin', 'cost_revenue_ratio', 'current_ratio', 'quick_ratio',
+    'cash_ratio', 'asset_turnover', 'debt_to_equity'
+]
+VALUATION_METRICS = ['roc', 'owner_earnings', 'fcf_yield']
+N_BASIC = len(BASIC_RATIOS)
+N_YEARLY = N_BASIC + len(VALUATION_METRICS)
+
+# Layout of the vector returned by _kernel
+FEATURE_NAMES = (
+    BASIC_RATIOS + [f"{k}_avg" for k in BASIC_RATIOS] +
+    VALUATION_METRICS + [f"{k}_avg" for k in VALUATION_METRICS] +
+    ['altman_z_score', 'graham_nnwc', 'graham_number']
+)
+N_FEATURES = len(FEATURE_NAMES)
+FEATURE_COLUMNS = pd.Index(FEATURE_NAMES)  # Built once, shared by every result frame
+MARKET_CAP_CATEGORIES = ['low', 'medium', 'high']  # In threshold order
+
+
+@njit(cache=True, error_model='numpy')
+def _yearly_metrics(col, out):
+    """Write basic ratios then valuation metrics for one year column into out"""
+    # Profitability Ratios
+    out[0] = col[IDX_NET_INCOME] / col[IDX_TOTAL_REVENUE]  # net_profit_margin
+    out[1] = col[IDX_COST_OF_REVENUE] / col[IDX_TOTAL_REVENUE]  # cost_revenue_ratio
+
+    # Liquidity Ratios
+    current_ratio = col[IDX_CURRENT_ASSETS] / col[IDX_CURRENT_LIABILITIES]
+    out[2] = current_ratio  # current_ratio
+    out[3] = current_ratio  # quick_ratio (no inventory row, so same as current_ratio)
+    out[4] = col[IDX_END_CASH_POSITION] / col[IDX_CURRENT_LIABILITIES]  # cash_ratio
+
+    # Efficiency Ratios
+    out[5] = col[IDX_TOTAL_REVENUE] / col[IDX_TOTAL_ASSETS]  # asset_turnover
+
+    # Leverage Ratios
+    out[6] = col[IDX_TOTAL_DEBT] / col[IDX_TOTAL_EQUITY]  # debt_to_equity
+
+    # Greenblatt's Magic Formula Components
+    out[7] = col[IDX_OPERATING_INCOME] / (col[IDX_WORKING_CAPITAL] + col[IDX_NET_TANGIBLE_ASSETS])  # roc
+
+    # Buffett's Owner Earnings
+    out[8] = col[IDX_OPERATING_CASH_FLOW] + col[IDX_CAPITAL_EXPENDITURE]  # owner_earnings
+
+    # FCF Yield components
+    out[9] = col[IDX_FREE_CASH_FLOW] / col[IDX_TOTAL_CAPITALIZATION]  # fcf_yield
+
+
+@njit(cache=True, error_model='numpy')
+def _altman_z(col):
+    """Altman Z-Score for one year column"""
+    total_assets = col[IDX_TOTAL_ASSETS]
+    return (
+        1.2 * (col[IDX_WORKING_CAPITAL] / total_assets) +
+        1.4 * (col[IDX_RETAINED_EARNINGS] / total_assets) +
+        3.3 * (col[IDX_OPERATING_INCOME] / total_assets) +
+        0.6 * (col[IDX_TOTAL_EQUITY] / col[IDX_TOTAL_DEBT]) +
+        0.999 * (col[IDX_TOTAL_REVENUE] / total_assets)
+    )
+
+
+@njit(cache=True, error_model='numpy')
+def _kernel(a):
+    """
+    Compute every numeric feature for one company
+    a: statement values, rows ordered as ROWS and one column per year (latest first)
+    Returns a vector laid out as FEATURE_NAMES; 3-year averages are NaN
+    when fewer than 3 years are available. Division by zero follows NumPy
+    semantics (inf / NaN) instead of raising
+    """
+    out = np.empty(N_FEATURES)
+
+    # Current year and 3-year average of the yearly metrics
+    current = np.empty(N_YEARLY)
+    _yearly_metrics(a[:, 0], current)
+
+    average = np.zeros(N_YEARLY)
+    if a.shape[1] >= 3:
+        year = np.empty(N_YEARLY)
+        for y in range(3):
+            _yearly_metrics(a[:, y], year)
+            average += year
+        average /= 3.0
+    else:
+        average[:] = np.nan
+
+    n_valuation = N_YEARLY - N_BASIC
+    out[:N_BASIC] = current[:N_BASIC]
+    out[N_BASIC:2 * N_BASIC] = average[:N_BASIC]
+    out[2 * N_BASIC:2 * N_BASIC + n_valuation] = current[N_BASIC:]
+    out[2 * N_BASIC + n_valuation:2 * N_YEARLY] = average[N_BASIC:]
+
+    # Altman Z-Score
+    col = a[:, 0]
+    out[2 * N_YEARLY] = _altman_z(col)
+
+    # Graham's Net-Net Working Capital
+    out[2 * N_YEARLY + 1] = col[IDX_CURRENT_ASSETS] - col[IDX_TOTAL_DEBT]
+
+    # Graham Number = √(22.5 * EPS * BVPS), tangible assets approximating BVPS
+    out[2 * N_YEARLY + 2] = np.sqrt(22.5 * col[IDX_DILUTED_EPS] * col[IDX_NET_TANGIBLE_ASSETS])
+
+    return out
+
+
+@njit(cache=True, parallel=True)
+def _batch_kernel(batch, out):
+    """Run _kernel for each company of a (companies x rows x years) batch in parallel"""
+    for i in prange(batch.shape[0]):
+        out[i] = _kernel(batch[i])
+
 
 class FinancialFeatureGenerator:
+    CACHE_SIZE = 256  # Max number of extracted arrays / feature vectors kept in memory
+
     def __init__(self):
         # Market cap categorization thresholds (you can adjust these)
         self.MARKET_CAP_THRESHOLDS = {
             'high': 500000000000,  # 500B
             'medium': 50000000000,  # 50B
         }
-        
+        self._cache = OrderedDict()  # LRU cache of extracted arrays keyed on input frame
+        self._feature_cache = OrderedDict()  # LRU cache of feature vectors keyed on array content
+
     def preprocess_data(self, df):
-        """Preprocess dataframe to clean column names and ensure correct types"""
-        year_cols = [str(col.year) for col in df.columns[:-1]]
-        cleaned_cols = year_cols + [df.columns[-1]]
-        df.columns = cleaned_cols
-        return df
-    
-    def calculate_historical_average(self, df, metric_func, years, prefix=''):
-        """Calculate both current and 3-year average for a given metric"""
-        features = {}
-        current_year = years[0]
-        
-        # Calculate current year metric
-        current_metrics = metric_func(df, current_year)
-        features.update({f"{k}_current" if prefix else k: v 
-                        for k, v in current_metrics.items()})
-        
-        # Calculate 3-year average
-        if len(years) >= 3:
-            three_year_metrics = {}
-            for year in years[:3]:  # Only take last 3 years
-                year_metrics = metric_func(df, year)
-                for k, v in year_metrics.items():
-                    if k not in three_year_metrics:
-                        three_year_metrics[k] = []
-                    three_year_metrics[k].append(v)
-            
-            # Calculate averages
-            for k, values in three_year_metrics.items():
-                features[f"{k}_3yr_avg" if prefix else f"{k}_avg"] = np.mean(values)
-        
-        return features
-    
-    def calculate_basic_ratios(self, df, year):
-        """Calculate basic financial ratios"""
-        features = {}
-        
-        # Profitability Ratios
-        features['net_profit_margin'] = (
-            df.loc['Net Income', year] / df.loc['Total Revenue', year]
-        )
-        
-        features['cost_revenue_ratio'] = (
-            df.loc['Cost Of Revenue', year] / df.loc['Total Revenue', year]
-        )
-        
-        # Liquidity Ratios
-        features['current_ratio'] = (
-            df.loc['Current Assets', year] / df.loc['Current Liabilities', year]
-        )
-        
-        features['quick_ratio'] = (
-            (df.loc['Current Assets', year]) / df.loc['Current Liabilities', year]
-        )
-        
-        features['cash_ratio'] = (
-            df.loc['End Cash Position', year] / df.loc['Current Liabilities', year]
-        )
-        
-        # Efficiency Ratios
-        features['asset_turnover'] = (
-            df.loc['Total Revenue', year] / df.loc['Total Assets', year]
-        )
-        
-        # Leverage Ratios
-        features['debt_to_equity'] = (
-            df.loc['Total Debt', year] / df.loc['Total Equity Gross Minority Interest', year]
-        )
-        
-        return features
+        """
+        Split a company's data into its name and its statement values
+        Date columns are relabelled with their (integer) year
+        Returns (company name, relabelled frame without the Company column);
+        the input frame is left untouched
+        """
+        company_name = df.iat[0, df.columns.get_loc('Company')]
+        statements = df.drop(columns='Company')
+        statements.columns = pd.DatetimeIndex(statements.columns).year
+        return company_name, statements
 
-    def calculate_valuation_metrics(self, df, year):
-        """Calculate valuation metrics"""
-        features = {}
-        
-        # Greenblatt's Magic Formula Components
-        features['roc'] = (
-            df.loc['Operating Income', year] /
-            (df.loc['Working Capital', year] + df.loc['Net Tangible Assets', year])
-        )
-        
-        # Buffett's Owner Earnings
-        features['owner_earnings'] = (
-            df.loc['Operating Cash Flow', year] + df.loc['Capital Expenditure', year]
-        )
-        
-        # FCF Yield components
-        features['fcf_yield'] = (
-            df.loc['Free Cash Flow', year] / df.loc['Total Capitalization', year]
-        )
-        
-        return features
+    def _extract(self, df):
+        """
+        Pull the company name and every row the kernel needs (as one
+        rows x years array) out of a company's data
+        Results are cached per frame object and its columns, so the same
+        frame passed again is not re-extracted. Frames are assumed not to be
+        modified in place between calls
+        Returns (company name, array); raises ValueError if there are no year columns
+        """
+        key = (id(df), tuple(df.columns))
+        cached = self._cache.get(key)
+        # id() values can be reused once a frame is freed, so check it is the same object
+        if cached is not None and cached[0]() is df:
+            self._cache.move_to_end(key)
+            return cached[1], cached[2]
 
-    def calculate_altman_z_score(self, df, year):
-        """Calculate Altman Z-Score"""
-        working_capital = df.loc['Working Capital', year]
-        total_assets = df.loc['Total Assets', year]
-        retained_earnings = df.loc['Retained Earnings', year]
-        ebit = df.loc['Operating Income', year]
-        total_equity = df.loc['Total Equity Gross Minority Interest', year]
-        total_liabilities = df.loc['Total Debt', year]
-        sales = df.loc['Total Revenue', year]
-        
-        z_score = (
-            1.2 * (working_capital / total_assets) +
-            1.4 * (retained_earnings / total_assets) +
-            3.3 * (ebit / total_assets) +
-            0.6 * (total_equity / total_liabilities) +
-            0.999 * (sales / total_assets)
-        )
-        
-        return {'altman_z_score': z_score}
-
-    def calculate_graham_metrics(self, df, year):
-        """Calculate Graham's metrics"""
-        features = {}
-        
-        # Graham's Net-Net Working Capital
-        features['graham_nnwc'] = (
-            df.loc['Current Assets', year] -
-            df.loc['Total Debt', year]
-        )
-        
-        # Graham Number = √(22.5 * EPS * BVPS)
-        eps = df.loc['Diluted EPS', year]
-        book_value_per_share = df.loc['Net Tangible Assets', year]  # Approximate
-        features['graham_number'] = np.sqrt(22.5 * eps * book_value_per_share)
-        
-        return features
+        company_name, statements = self.preprocess_data(df)
+        arr = statements.loc[ROWS].to_numpy(dtype=np.float64)
+        if arr.shape[1] == 0:
+            raise ValueError(f"No year columns for company {company_name}")
+
+        self._cache[key] = (weakref.ref(df), company_name, arr)
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return company_name, arr
+
+    def _market_cap_category(self, market_cap):
+        """Map market cap values to a 'low' / 'medium' / 'high' categorical"""
+        thresholds = np.array([
+            self.MARKET_CAP_THRESHOLDS['medium'], self.MARKET_CAP_THRESHOLDS['high']
+        ], dtype=np.float64)
+        codes = np.searchsorted(thresholds, market_cap, side='right')
+        codes[np.isnan(market_cap)] = 0  # Missing market cap counts as 'low'
+        return pd.Categorical.from_codes(codes, categories=MARKET_CAP_CATEGORIES)
+
+    def _feature_key(self, arr):
+        """Hash the extracted statement values (and their shape) into a cache key"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(arr.shape).encode())
+        digest.update(np.ascontiguousarray(arr).tobytes())
+        return digest.digest()
+
+    def _compute_features(self, arrays):
+        """
+        Feature vectors for a list of extracted arrays, one row per array
+        Only arrays not seen before go through the compiled kernel
+        """
+        keys = [self._feature_key(arr) for arr in arrays]
+        values = np.empty((len(arrays), N_FEATURES))
+
+        missing = []
+        for i, key in enumerate(keys):
+            cached = self._feature_cache.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                self._feature_cache.move_to_end(key)
+                values[i] = cached
+
+        if missing:
+            # Shorter histories are padded with NaN, so their missing years
+            # (and any average over them) come out as NaN
+            n_years = max(arrays[i].shape[1] for i in missing)
+            batch = np.full((len(missing), len(ROWS), n_years), np.nan)
+            for j, i in enumerate(missing):
+                batch[j, :, :arrays[i].shape[1]] = arrays[i]
+
+            computed = np.empty((len(missing), N_FEATURES))
+            _batch_kernel(batch, computed)
+            # Zero denominators give ±inf rather than raising; report them as missing
+            computed[np.isinf(computed)] = np.nan
+
+            for j, i in enumerate(missing):
+                values[i] = computed[j]
+                self._feature_cache[keys[i]] = computed[j].copy()
+                if len(self._feature_cache) > self.CACHE_SIZE:
+                    self._feature_cache.popitem(last=False)
+
+        return values
 
     def generate_all_features(self, df):
-        """Generate all features for a company"""
-        df = self.preprocess_data(df)
-        years = [col for col in df.columns if col != 'Company']
-        
-        features = {}
-        company_name = df['Company'].iloc[0]
-        features['Company'] = company_name
-        
-        # Calculate current and historical averages for all metrics
-        features.update(self.calculate_historical_average(df, self.calculate_basic_ratios, years))
-        features.update(self.calculate_historical_average(df, self.calculate_valuation_metrics, years))
-        
-        # Add Altman Z-Score
-        current_year = years[0]
-        features.update(self.calculate_altman_z_score(df, current_year))
-        
-        # Add Graham metrics
-        features.update(self.calculate_graham_metrics(df, current_year))
-        
-        # Market cap categorization
-        market_cap = df.loc['Total Capitalization', current_year]
-        if market_cap >= self.MARKET_CAP_THRESHOLDS['high']:
-            features['market_cap_category'] = 'high'
-        elif market_cap >= self.MARKET_CAP_THRESHOLDS['medium']:
-            features['market_cap_category'] = 'medium'
-        else:
-            features['market_cap_category'] = 'low'
-        
-        return pd.Series(features)
+        """
+        Generate all numeric features for a company
+        Returns a vector laid out as FEATURE_NAMES
+        """
+        _, arr = self._extract(df)
+        return self._compute_features([arr])[0]
 
     def process_multiple_companies(self, df_dict):
-        """Process multiple companies and return a DataFrame with all features"""
-        all_features = []
-        
+        """
+        Process multiple companies and return a DataFrame with all features
+        All companies not already in the feature cache are stacked into one
+        (companies x rows x years) array and run through the compiled
+        feature kernel together
+        """
+        # Preallocated per-company buffers; trimmed to the companies extracted
+        company_names = np.empty(len(df_dict), dtype=object)
+        market_cap = np.empty(len(df_dict))
+        arrays = []
+
         for company, df in df_dict.items():
             try:
-                features = self.generate_all_features(df)
-                all_features.append(features)
+                company_name, arr = self._extract(df)
             except Exception as e:
                 print(f"Error processing company {company}: {str(e)}")
                 continue
-        
-        return pd.DataFrame(all_features)
\ No newline at end of file
+            company_names[len(arrays)] = company_name
+            market_cap[len(arrays)] = arr[IDX_TOTAL_CAPITALIZATION, 0]
+            arrays.append(arr)
+
+        if not arrays:
+            return pd.DataFrame()
+
+        values = self._compute_features(arrays)
+        company_names = company_names[:len(arrays)]
+        market_cap = market_cap[:len(arrays)]
+
+        features = pd.DataFrame(values, columns=FEATURE_COLUMNS)
+        features.insert(0, 'Company', company_names)
+        features['market_cap_category'] = self._market_cap_category(market_cap)
+
+        return features
@@ -0,0 +1,140 @@
+import pytest
+import pandas as pd
+import numpy as np
+from financial_feature_generator import FinancialFeatureGenerator, ROWS, FEATURE_NAMES
+
+def make_company_data(name, n_years=4, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end='2024-03-31', periods=n_years, freq='YE-MAR')[::-1]
+    df = pd.DataFrame(rng.uniform(1e9, 1e11, (len(ROWS), n_years)), index=ROWS, columns=dates)
+    df.loc['Capital Expenditure'] *= -1
+    df['Company'] = name
+    return df
+
+@pytest.fixture
+def company_data():
+    return make_company_data('RELIANCE')
+
+def test_generate_all_features(company_data):
+    raw = company_data.copy()
+    generator = FinancialFeatureGenerator()
+    values = generator.generate_all_features(company_data)
+
+    assert values.shape == (len(FEATURE_NAMES),)
+    features = dict(zip(FEATURE_NAMES, values))
+    current, previous = raw.columns[0], raw.columns[1]
+    assert features['net_profit_margin'] == pytest.approx(
+        raw.loc['Net Income', current] / raw.loc['Total Revenue', current]
+    )
+    assert features['debt_to_equity_avg'] == pytest.approx(np.mean([
+        raw.loc['Total Debt', year] / raw.loc['Total Equity Gross Minority Interest', year]
+        for year in raw.columns[:3]
+    ]))
+    assert features['owner_earnings'] == pytest.approx(
+        raw.loc['Operating Cash Flow', current] + raw.loc['Capital Expenditure', current]
+    )
+    assert features['graham_number'] == pytest.approx(
+        np.sqrt(22.5 * raw.loc['Diluted EPS', current] * raw.loc['Net Tangible Assets', current])
+    )
+    total_assets = raw.loc['Total Assets', current]
+    assert features['altman_z_score'] == pytest.approx(
+        1.2 * raw.loc['Working Capital', current] / total_assets +
+        1.4 * raw.loc['Retained Earnings', current] / total_assets +
+        3.3 * raw.loc['Operating Income', current] / total_assets +
+        0.6 * raw.loc['Total Equity Gross Minority Interest', current] / raw.loc['Total Debt', current] +
+        0.999 * raw.loc['Total Revenue', current] / total_assets
+    )
+    assert features['roc'] != pytest.approx(
+        raw.loc['Operating Income', previous] /
+        (raw.loc['Working Capital', previous] + raw.loc['Net Tangible Assets', previous])
+    )  # Current-year features come from the latest column
+
+def test_market_cap_category(company_data):
+    generator = FinancialFeatureGenerator()
+    company_data.loc['Total Capitalization'] = 6e11
+    features = generator.process_multiple_companies({'RELIANCE': company_data})
+    assert features['market_cap_category'].tolist() == ['high']
+    assert isinstance(features['market_cap_category'].dtype, pd.CategoricalDtype)
+
+def test_market_cap_category_thresholds():
+    generator = FinancialFeatureGenerator()
+    market_cap = np.array([5e11, 4.9e11, 5e10, 1e9, np.nan])
+    categories = generator._market_cap_category(market_cap)
+    assert list(categories) == ['high', 'medium', 'medium', 'low', 'low']
+
+def test_process_multiple_companies():
+    generator = FinancialFeatureGenerator()
+    incomplete = make_company_data('BROKEN', seed=2).drop(index='Diluted EPS')
+    df_dict = {
+        'RELIANCE': make_company_data('RELIANCE', seed=0),
+        'TCS': make_company_data('TCS', seed=1),
+        'BROKEN': incomplete,
+    }
+
+    features = generator.process_multiple_companies(df_dict)
+
+    assert features['Company'].tolist() == ['RELIANCE', 'TCS']
+    assert 'altman_z_score' in features.columns
+    assert 'debt_to_equity_avg' in features.columns
+
+def test_extraction_is_cached_and_leaves_input_untouched(company_data):
+    generator = FinancialFeatureGenerator()
+    columns = company_data.columns.copy()
+
+    first = generator.generate_all_features(company_data)
+    second = generator.generate_all_features(company_data)
+
+    assert company_data.columns.equals(columns)
+    assert len(generator._cache) == 1
+    np.testing.assert_array_equal(first, second)
+
+def test_preprocess_data_labels_years(company_data):
+    generator = FinancialFeatureGenerator()
+    columns = company_data.columns.copy()
+    company_name, statements = generator.preprocess_data(company_data)
+    assert company_name == 'RELIANCE'
+    assert statements.columns.tolist() == [2024, 2023, 2022, 2021]
+    assert pd.api.types.is_integer_dtype(statements.columns)
+    assert company_data.columns.equals(columns)
+
+    # The kernel's input is built from the relabelled frame, in year order
+    extracted_name, arr = generator._extract(company_data)
+    assert extracted_name == company_name
+    np.testing.assert_array_equal(arr, statements.loc[ROWS].to_numpy())
+
+def test_features_are_cached_by_content():
+    generator = FinancialFeatureGenerator()
+    df_dict = {'RELIANCE': make_company_data('RELIANCE', seed=0)}
+
+    first = generator.process_multiple_companies(df_dict)
+    # A new frame with identical content hits the feature cache
+    second = generator.process_multiple_companies({'RELIANCE': make_company_data('RELIANCE', seed=0)})
+    changed = generator.process_multiple_companies({'RELIANCE': make_company_data('RELIANCE', seed=5)})
+
+    assert len(generator._feature_cache) == 2
+    pd.testing.assert_frame_equal(first, second)
+    assert first['net_profit_margin'].iloc[0] != changed['net_profit_margin'].iloc[0]
+
+def test_zero_denominators_become_nan():
+    generator = FinancialFeatureGenerator()
+    zero_liabilities = make_company_data('NODEBT', seed=3)
+    zero_liabilities.loc['Current Liabilities'] = 0.0
+
+    features = generator.process_multiple_companies({'NODEBT': zero_liabilities})
+
+    assert np.isnan(features['current_ratio'].iloc[0])
+    assert np.isnan(features['cash_ratio_avg'].iloc[0])
+    assert np.isfinite(features['net_profit_margin'].iloc[0])
+
+def test_company_without_years_is_rejected():
+    generator = FinancialFeatureGenerator()
+    no_years = make_company_data('EMPTY').loc[:, ['Company']]
+
+    with pytest.raises(ValueError):
+        generator.generate_all_features(no_years)
+
+    features = generator.process_multiple_companies({
+        'EMPTY': no_years,
+        'RELIANCE': make_company_data('RELIANCE'),
+    })
+    assert features['Company'].tolist() == ['RELIANCE']
@@ -1,7 +1,9 @@
 import os
 import pandas as pd
-import json
+import pyarrow.parquet as pq
+import orjson
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from yahoo_finance_collector import YahooFinanceCollector
 from data_validator import DataValidator  # Add this import
 from data_preprocessing_module import DataPreprocessor
@@ -14,80 +16,195 @@ def create_directory(directory: str) -> None:
     Args:
         directory (str): Path to directory to create
     """
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-        print(f"Created directory: {directory}")
+    # exist_ok avoids a check-then-create race when called from worker threads
+    os.makedirs(directory, exist_ok=True)
+
+def _nonempty(data) -> bool:
+    """True for a non-empty DataFrame, or any other truthy payload (e.g. the info dict)"""
+    if isinstance(data, pd.DataFrame):
+        return not data.empty
+    return bool(data)
+
 
 def save_fundamental_data(collector: YahooFinanceCollector, symbol: str, base_filename: str) -> None:
     print(f"\nFetching fundamental data for {symbol}...")
     fund_data = collector.get_fundamental_data(symbol)
     
-    # Ensure directory exists
-    directory = os.path.dirname(base_filename)
-    create_directory(directory)
-    
     # Save each type of fundamental data separately
     for data_type, data in fund_data.items():
-        if not data.empty if isinstance(data, pd.DataFrame) else data:
-            # Update the filename format to match what we're looking for later
-            data_type_name = data_type.lower().replace(' ', '_')
-            filename = f"{base_filename}_{data_type_name}.parquet"
-            try:
-                collector.save_data(data, filename)
-                print(f"Saved {data_type} data for {symbol}")
-            except Exception as e:
-                print(f"Failed to save {data_type} data for {symbol}: {e}")
+        if not _nonempty(data):
+            continue
+        # Update the filename format to match what we're looking for later
+        data_type_name = data_type.lower().replace(' ', '_')
+        filename = f"{base_filename}_{data_type_name}.parquet"
+        try:
+            collector.save_data(data, filename)
+            print(f"Saved {data_type} data for {symbol}")
+        except Exception as e:
+            print(f"Failed to save {data_type} data for {symbol}: {e}")
                 
                 
-def save_historical_data(collector: YahooFinanceCollector, symbol: str, base_filename: str) -> None:
+# File in each data directory naming the latest run's timestamp
+LATEST_POINTER = 'LATEST'
+
+# Also write <data_type>_validated.parquet files (for debugging or re-running run_preprocessing)
+SAVE_VALIDATED = False
+
+# Max stocks processed at once; kept small to stay well under the collector's rate limit
+MAX_WORKERS = 4
+
+# Historical timeframes to collect: period -> interval
+TIMEFRAMES = {
+    "1y": "1d",     # 1 year of daily data
+    "5y": "1wk",    # 5 years of weekly data
+    "max": "1mo"    # Max period with monthly data
+}
+
+# Columns read from price history files
+HISTORICAL_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+
+# Data types validated and preprocessed per stock -> columns to read
+# (None reads every column; fundamentals have one column per report date)
+DATA_COLUMNS = {
+    'balance_sheet': None,
+    'income_statement': None,
+    'cash_flow': None,
+    **{f'historical_{period}_{interval}': HISTORICAL_COLUMNS for period, interval in TIMEFRAMES.items()}
+}
+
+
+# Resampling rule and label alignment matching Yahoo's bars for each interval
+RESAMPLE_RULES = {
+    "1wk": "W-SUN",  # Weeks Monday-Sunday, labelled by their Monday
+    "1mo": "MS"      # Calendar months, labelled by their first day
+}
+
+# Aggregation of daily bars into coarser ones
+RESAMPLE_AGG = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum',
+    'Dividends': 'sum',
+    'Stock Splits': 'max'
+}
+
+
+def resample_history(daily: pd.DataFrame, period: str, interval: str) -> pd.DataFrame:
+    """
+    Derive one timeframe of price history from already downloaded daily bars.
+    
+    Args:
+        daily (pd.DataFrame): Daily price history
+        period (str): Period to keep (e.g., "5y" or "max")
+        interval (str): Bar interval (e.g., "1d", "1wk" or "1mo")
+    """
+    if daily.empty:
+        return daily
+    
+    if period != "max":
+        start = daily.index[-1] - pd.DateOffset(years=int(period.rstrip('y')))
+        daily = daily[daily.index > start]
+    
+    if interval == "1d":
+        return daily
+    
+    rule = RESAMPLE_RULES[interval]
+    agg = {col: how for col, how in RESAMPLE_AGG.items() if col in daily.columns}
+    if rule == "MS":
+        bars = daily.resample(rule).agg(agg)
+    else:
+        bars = daily.resample(rule, label='left', closed='left').agg(agg)
+        bars.index = bars.index + pd.Timedelta(days=1)
+    # Drop periods without any trading days
+    return bars.dropna(subset=['Close'])
+
+
+def save_historical_timeframe(collector: YahooFinanceCollector, symbol: str, base_filename: str,
+                              period: str, interval: str, daily: pd.DataFrame = None) -> None:
+    """
+    Collect and save historical data for a single timeframe.
+    
+    Args:
+        collector: YahooFinanceCollector instance
+        symbol (str): Stock symbol (e.g., "RELIANCE.NS")
+        base_filename (str): Base path for saving files (directory must already exist)
+        period (str): Period to fetch (e.g., "1y")
+        interval (str): Bar interval (e.g., "1d")
+        daily (pd.DataFrame): Optional full daily history; when given the
+            timeframe is resampled from it instead of fetched
+    """
+    try:
+        if daily is not None and not daily.empty:
+            hist_data = resample_history(daily, period, interval)
+        else:
+            hist_data = collector.get_historical_data(symbol, period=period, interval=interval)
+        if not hist_data.empty:
+            filename = f"{base_filename}_historical_{period}_{interval}.parquet"
+            collector.save_data(hist_data, filename)
+            print(f"Saved {period} historical data for {symbol}")
+    except Exception as e:
+        print(f"Failed to save {period} historical data for {symbol}: {e}")
+
+
+def save_historical_data(collector: YahooFinanceCollector, symbol: str, base_filename: str,
+                         daily: pd.DataFrame = None) -> None:
     """
     Collect and save historical data for different timeframes.
     
     Args:
         collector: YahooFinanceCollector instance
         symbol (str): Stock symbol (e.g., "RELIANCE.NS")
-        base_filename (str): Base path for saving files
+        base_filename (str): Base path for saving files (directory must already exist)
+        daily (pd.DataFrame): Optional full daily history to derive every
+            timeframe from, instead of one request per timeframe
     """
     print(f"\nFetching historical data for {symbol}...")
     
-    # Ensure directory exists
-    directory = os.path.dirname(base_filename)
-    create_directory(directory)
-    
-    # Define different timeframes for data collection
-    timeframes = {
-        "1y": "1d",     # 1 year of daily data
-        "5y": "1wk",    # 5 years of weekly data
-        "max": "1mo"    # Max period with monthly data
-    }
-    
     # Collect and save data for each timeframe
-    for period, interval in timeframes.items():
-        try:
-            hist_data = collector.get_historical_data(symbol, period=period, interval=interval)
-            if not hist_data.empty:
-                filename = f"{base_filename}_historical_{period}_{interval}.parquet"
-                collector.save_data(hist_data, filename)
-                print(f"Saved {period} historical data for {symbol}")
-        except Exception as e:
-            print(f"Failed to save {period} historical data for {symbol}: {e}")
+    for period, interval in TIMEFRAMES.items():
+        save_historical_timeframe(collector, symbol, base_filename, period, interval, daily)
             
             
-def convert_to_serializable(obj):
-    """Convert objects to JSON serializable format"""
+def _json_default(obj):
+    """Convert the few non-JSON types found in validation results"""
     if isinstance(obj, pd.Timestamp):
         return obj.strftime('%Y-%m-%d %H:%M:%S')
-    elif isinstance(obj, dict):
-        return {str(k): convert_to_serializable(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_to_serializable(i) for i in obj]
-    elif isinstance(obj, (pd.Index, pd.Series)):
-        return convert_to_serializable(obj.tolist())
-    return obj
+    if isinstance(obj, (pd.Index, pd.Series)):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _read_parquet(path: str, columns=None) -> pd.DataFrame:
+    """
+    Read a parquet file through pyarrow.
+    
+    Args:
+        path (str): Parquet file to read
+        columns: Optional columns to load; those present in the file are
+            read in file order (the index is always restored)
+    """
+    if columns is not None:
+        wanted = set(columns)
+        columns = [col for col in pq.read_schema(path).names if col in wanted]
+    # Memory-map the file so recently written data is served from the page cache, and
+    # let Arrow release each column as pandas takes it over to keep peak memory down
+    table = pq.read_table(path, columns=columns, use_pandas_metadata=True, memory_map=True)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
 
-def validate_collected_data(data_files: dict, validation_dir: str) -> dict:
+def validate_collected_data(data_files: dict, validation_dir: str, save_validated: bool = SAVE_VALIDATED) -> tuple:
     """
     Validate collected data files and save validation results
+    
+    Args:
+        data_files (dict): data type -> raw parquet file
+        validation_dir (str): Directory to save validation results
+        save_validated (bool): Also write each validated frame to
+            <data_type>_validated.parquet (defaults to SAVE_VALIDATED)
+        
+    Returns:
+        tuple: (validation results, validated DataFrames by data type)
     """
     validator = DataValidator()
     validation_data = {}
@@ -95,29 +212,36 @@ def validate_collected_data(data_files: dict, validation_dir: str) -> dict:
     # Create validation directory if it doesn't exist
     os.makedirs(validation_dir, exist_ok=True)
     
-    # Read and organize data for validation
-    for data_type, file_path in data_files.items():
+    def read_data(data_type, file_path):
+        """Read one data file, returning the error instead of raising it"""
         try:
-            df = pd.read_parquet(file_path)
-            validation_data[data_type] = df
+            return _read_parquet(file_path, columns=DATA_COLUMNS.get(data_type))
         except Exception as e:
-            print(f"Error reading {data_type} data: {e}")
+            return e
+    
+    # Read all files concurrently, then organize them for validation in order
+    with ThreadPoolExecutor(max_workers=max(1, len(data_files))) as executor:
+        frames = list(executor.map(read_data, data_files.keys(), data_files.values()))
+    
+    for data_type, df in zip(data_files, frames):
+        if isinstance(df, Exception):
+            print(f"Error reading {data_type} data: {df}")
+        else:
+            validation_data[data_type] = df
     
     # Run validations
     validation_results = validator.run_all_validations(validation_data)
     
-    # Convert results to serializable format
-    serializable_results = convert_to_serializable(validation_results)
-    
-    # Save validation results
+    # Save validation results; orjson converts the remaining pandas types via _json_default
     validation_file = os.path.join(validation_dir, 'validation_results.json')
-    with open(validation_file, 'w') as f:
-        json.dump(serializable_results, f)
+    with open(validation_file, 'wb') as f:
+        f.write(orjson.dumps(validation_results, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY))
     
     # Save validated data
-    for data_type, df in validation_data.items():
-        output_file = os.path.join(validation_dir, f"{data_type}_validated.parquet")
-        df.to_parquet(output_file)
+    if save_validated:
+        for data_type, df in validation_data.items():
+            output_file = os.path.join(validation_dir, f"{data_type}_validated.parquet")
+            df.to_parquet(output_file)
     
     # Print validation results
     for data_type, results in validation_results.items():
@@ -128,11 +252,56 @@ def validate_collected_data(data_files: dict, validation_dir: str) -> dict:
         if 'freshness' in results:
             print("Freshness:", results['freshness']['message'])
             
-    return validation_results
+    return validation_results, validation_data
+
+
+def save_processed_data(processed_data: dict, output_dir: str) -> None:
+    """
+    Save each processed DataFrame to <output_dir>/<data_type>.parquet
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for data_type, data in processed_data.items():
+        output_file = os.path.join(output_dir, f"{data_type}.parquet")
+        if isinstance(data, pd.DataFrame):
+            data.to_parquet(output_file)
+
+def mark_latest_run(directory: str, timestamp: str) -> None:
+    """
+    Point <directory>/LATEST at the given run, replacing it atomically.
+    """
+    pointer = os.path.join(directory, LATEST_POINTER)
+    with open(pointer + '.tmp', 'w') as f:
+        f.write(timestamp)
+    os.replace(pointer + '.tmp', pointer)
+
+
+def get_latest_run(directory: str):
+    """
+    Name of the latest timestamped run directory, or None if there is none.
+    Reads the LATEST pointer; falls back to scanning for the largest
+    timestamp when the pointer is missing or stale.
+    """
+    try:
+        with open(os.path.join(directory, LATEST_POINTER)) as f:
+            latest = f.read().strip()
+        if latest and os.path.isdir(os.path.join(directory, latest)):
+            return latest
+    except FileNotFoundError:
+        pass
+    
+    # scandir entries carry their type, so no extra stat call per entry
+    with os.scandir(directory) as entries:
+        timestamp_dirs = [entry.name for entry in entries if entry.is_dir()]
+    return max(timestamp_dirs) if timestamp_dirs else None
+
 
 def run_preprocessing(validation_dir: str, processed_dir: str):
     """
-    Run preprocessing on validated data
+    Run preprocessing on validated data saved to disk
+    
+    main() preprocesses the validated frames in memory and does not call this.
+    It only finds input for runs where SAVE_VALIDATED was on, since otherwise
+    no <data_type>_validated.parquet files are written
     
     Args:
         validation_dir (str): Directory containing validated data
@@ -146,42 +315,70 @@ def run_preprocessing(validation_dir: str, processed_dir: str):
     
     try:
         # Get latest timestamp directory
-        timestamp_dirs = [d for d in os.listdir(validation_dir) 
-                        if os.path.isdir(os.path.join(validation_dir, d))]
-        if not timestamp_dirs:
+        latest_dir = get_latest_run(validation_dir)
+        if latest_dir is None:
             raise Exception("No validated data found")
-            
-        latest_dir = max(timestamp_dirs)
         
         # Process each stock's data
-        stock_dirs = os.listdir(os.path.join(validation_dir, latest_dir))
-        for stock in stock_dirs:
+        processed_run_dir = os.path.join(processed_dir, latest_dir)
+        with os.scandir(os.path.join(validation_dir, latest_dir)) as entries:
+            stock_dirs = [(entry.name, entry.path) for entry in entries]
+        for stock, stock_dir in stock_dirs:
             print(f"\nProcessing data for {stock}")
-            stock_dir = os.path.join(validation_dir, latest_dir, stock)
             
-            # Read validated data
+            # Read validated data; the expected files are known, so no listing is needed
             data_dict = {}
-            for file in os.listdir(stock_dir):
-                if file.endswith('_validated.parquet'):
-                    data_type = file.replace('_validated.parquet', '')
-                    data_dict[data_type] = pd.read_parquet(os.path.join(stock_dir, file))
+            for data_type, columns in DATA_COLUMNS.items():
+                file_path = os.path.join(stock_dir, f"{data_type}_validated.parquet")
+                if os.path.exists(file_path):
+                    data_dict[data_type] = _read_parquet(file_path, columns=columns)
             
             # Process data
             processed_data = preprocessor.process_stock_data(data_dict)
             
             # Save processed data
-            output_dir = os.path.join(processed_dir, latest_dir, stock)
-            os.makedirs(output_dir, exist_ok=True)
-            
-            for data_type, data in processed_data.items():
-                output_file = os.path.join(output_dir, f"{data_type}.parquet")
-                if isinstance(data, pd.DataFrame):
-                    data.to_parquet(output_file)
+            save_processed_data(processed_data, os.path.join(processed_run_dir, stock))
                     
     except Exception as e:
         print(f"Error in preprocessing: {e}")
 
 
+def process_symbol(collector: YahooFinanceCollector, symbol: str, base_filename: str,
+                   validation_dir: str, processed_dir: str, daily: pd.DataFrame = None) -> dict:
+    """
+    Collect, save, validate and preprocess all data for one stock.
+    Validated data is handed to the preprocessor in memory.
+    
+    Args:
+        collector: YahooFinanceCollector instance
+        symbol (str): Stock symbol (e.g., "RELIANCE.NS")
+        base_filename (str): Base path for saving files (directory must already exist)
+        validation_dir (str): Directory to save validation results for this stock
+        processed_dir (str): Directory to save processed data for this stock
+        daily (pd.DataFrame): Optional pre-downloaded daily history for this stock
+        
+    Returns:
+        dict: Validation results per data type
+    """
+    # Collect fundamental and historical data
+    save_fundamental_data(collector, symbol, base_filename)
+    save_historical_data(collector, symbol, base_filename, daily)
+    
+    # Validate collected data
+    print(f"\nValidating data for {symbol}...")
+    data_files = {data_type: f"{base_filename}_{data_type}.parquet" for data_type in DATA_COLUMNS}
+    validation_results, validation_data = validate_collected_data(
+        data_files, validation_dir, save_validated=SAVE_VALIDATED
+    )
+    
+    # Preprocess the validated frames directly instead of re-reading them from disk
+    print(f"\nProcessing data for {symbol}")
+    processed_data = DataPreprocessor().process_stock_data(validation_data)
+    save_processed_data(processed_data, processed_dir)
+    
+    return validation_results
+
+
 def main():
     # Initialize the collector
     collector = YahooFinanceCollector()
@@ -203,46 +400,45 @@ def main():
     # List of stocks to collect data for
     stocks = ["RELIANCE.NS", "TCS.NS", "HDFCBANK.NS"]
     
-    # Collect and validate data for each stock
-    for symbol in stocks:
-        try:
-            # Create base filename for this stock
-            base_filename = os.path.join(
-                raw_data_dir, 
-                timestamp, 
-                symbol.replace('.NS', '')
-            )
-            
-            # Collect fundamental and historical data
-            save_fundamental_data(collector, symbol, base_filename)
-            save_historical_data(collector, symbol, base_filename)
-            
-            # Validate collected data
-            print(f"\nValidating data for {symbol}...")
-            data_files = {
-                'balance_sheet': f"{base_filename}_balance_sheet.parquet",
-                'income_statement': f"{base_filename}_income_statement.parquet",
-                'cash_flow': f"{base_filename}_cash_flow.parquet",
-                'historical_1y_1d': f"{base_filename}_historical_1y_1d.parquet",
-                'historical_5y_1wk': f"{base_filename}_historical_5y_1wk.parquet",
-                'historical_max_1mo': f"{base_filename}_historical_max_1mo.parquet"
-
-                # add validation of other historical data 
-            }
-            validation_results = validate_collected_data(
-                data_files, 
-                os.path.join(validation_dir, timestamp, symbol.replace('.NS', ''))
-            )
-            
-        except Exception as e:
-            print(f"Error processing {symbol}: {e}")
+    # All raw files for this run share one timestamp directory
+    run_dir = os.path.join(raw_data_dir, timestamp)
+    create_directory(run_dir)
+    
+    # Per-stock name and base filename, computed once
+    stock_names = {symbol: symbol.replace('.NS', '') for symbol in stocks}
+    base_filenames = {symbol: os.path.join(run_dir, name) for symbol, name in stock_names.items()}
+    validation_run_dir = os.path.join(validation_dir, timestamp)
+    processed_run_dir = os.path.join(processed_dir, timestamp)
+    
+    # Download daily history for every stock in one batch; each timeframe is resampled from it
+    print("\nFetching historical data for all stocks...")
+    daily_history = collector.get_historical_data_batch(stocks)
+    
+    # Stocks are network bound, so collect and validate them concurrently
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(
+                process_symbol, collector, symbol, base_filename,
+                os.path.join(validation_run_dir, stock_names[symbol]),
+                os.path.join(processed_run_dir, stock_names[symbol]),
+                daily_history.get(symbol)
+            ): symbol
+            for symbol, base_filename in base_filenames.items()
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                future.result()
+                print(f"\nFinished {symbol}")
+            except Exception as e:
+                print(f"Error processing {symbol}: {e}")
     
-    print("\nData collection and validation complete!")
+    # Record this run as the latest for later lookups
+    for directory in (validation_dir, processed_dir):
+        if os.path.isdir(os.path.join(directory, timestamp)):
+            mark_latest_run(directory, timestamp)
     
-    # Run preprocessing
-    print("\nStarting preprocessing...")
-    run_preprocessing(validation_dir, processed_dir)
-    print("\nPreprocessing complete!")
+    print("\nData collection, validation and preprocessing complete!")
 
     
     
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from main import save_fundamental_data, resample_history, mark_latest_run, get_latest_run
+
+class RecordingCollector:
+    """Collector returning canned fundamentals and recording what gets saved"""
+    def __init__(self, fund_data):
+        self.fund_data = fund_data
+        self.saved = {}
+
+    def get_fundamental_data(self, symbol):
+        return self.fund_data
+
+    def save_data(self, data, filename):
+        self.saved[filename] = data
+
+def test_save_fundamental_data_skips_empty_payloads():
+    info = {'shortName': 'Reliance Industries', 'marketCap': 1.7e13}
+    balance_sheet = pd.DataFrame({'2024-03-31': [1.0]}, index=['Total Debt'])
+    collector = RecordingCollector({
+        'info': info,
+        'balance_sheet': balance_sheet,
+        'income_statement': pd.DataFrame(),
+        'cash_flow': {},
+    })
+
+    save_fundamental_data(collector, 'RELIANCE.NS', 'base/RELIANCE')
+
+    assert set(collector.saved) == {'base/RELIANCE_info.parquet', 'base/RELIANCE_balance_sheet.parquet'}
+    assert collector.saved['base/RELIANCE_info.parquet'] is info
+
+def make_daily_history(start='2018-01-01', end='2024-03-28'):
+    index = pd.bdate_range(start, end, tz='Asia/Kolkata', name='Date')
+    n = len(index)
+    return pd.DataFrame({
+        'Open': np.arange(n, dtype=float),
+        'High': np.arange(n, dtype=float) + 2,
+        'Low': np.arange(n, dtype=float) - 2,
+        'Close': np.arange(n, dtype=float) + 1,
+        'Volume': np.full(n, 10),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0,
+    }, index=index)
+
+def test_resample_history_weekly_bars():
+    daily = make_daily_history()
+    weekly = resample_history(daily, '5y', '1wk')
+
+    # Bars are labelled by the Monday starting each week, as Yahoo does
+    assert (weekly.index.dayofweek == 0).all()
+    # Only the last 5 years are kept
+    assert weekly.index[0] >= daily.index[-1] - pd.DateOffset(years=5) - pd.Timedelta(days=6)
+    assert daily.index[0] < weekly.index[0]
+
+    week = daily.loc['2024-03-18':'2024-03-22']
+    bar = weekly.loc['2024-03-18']
+    assert bar['Open'] == week['Open'].iloc[0]
+    assert bar['High'] == week['High'].max()
+    assert bar['Low'] == week['Low'].min()
+    assert bar['Close'] == week['Close'].iloc[-1]
+    assert bar['Volume'] == week['Volume'].sum()
+
+def test_resample_history_monthly_and_daily():
+    daily = make_daily_history()
+
+    monthly = resample_history(daily, 'max', '1mo')
+    assert (monthly.index.day == 1).all()
+    assert monthly.index[0] == pd.Timestamp('2018-01-01', tz='Asia/Kolkata')
+    assert monthly.loc['2024-02-01', 'Volume'] == daily.loc['2024-02', 'Volume'].sum()
+
+    last_year = resample_history(daily, '1y', '1d')
+    assert last_year.index[-1] == daily.index[-1]
+    assert last_year.index[0] > daily.index[-1] - pd.DateOffset(years=1)
+    pd.testing.assert_frame_equal(last_year, daily.loc[last_year.index[0]:])
+
+def test_latest_run_pointer_and_fallbacks(tmp_path):
+    (tmp_path / '20240101_1000').mkdir()
+    (tmp_path / '20240301_1000').mkdir()
+
+    # No pointer: the largest timestamp directory wins
+    assert get_latest_run(str(tmp_path)) == '20240301_1000'
+
+    # The pointer is followed even when it is not the largest name,
+    # and the LATEST file itself is never taken for a run
+    mark_latest_run(str(tmp_path), '20240101_1000')
+    assert (tmp_path / 'LATEST').read_text() == '20240101_1000'
+    assert get_latest_run(str(tmp_path)) == '20240101_1000'
+
+    # A pointer to a deleted run falls back to scanning
+    (tmp_path / '20240101_1000').rmdir()
+    assert get_latest_run(str(tmp_path)) == '20240301_1000'
+
+def test_latest_run_empty_directory(tmp_path):
+    mark_latest_run(str(tmp_path), '20240101_1000')
+    assert get_latest_run(str(tmp_path)) is None
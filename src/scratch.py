@@ -3,23 +3,31 @@
 # print(data.head(10))
 
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from glob import glob
 import os
 
-# Find latest data directory
-data_dir = "../data"
-timestamp_dirs = sorted(glob(os.path.join(data_dir, "*")))
-latest_dir = timestamp_dirs[-1] if timestamp_dirs else None
+if __name__ == "__main__":
+    # Find latest data directory
+    data_dir = "../data"
+    timestamp_dirs = sorted(glob(os.path.join(data_dir, "*")))
+    latest_dir = timestamp_dirs[-1] if timestamp_dirs else None
 
-if latest_dir:
-    reliance_files = glob(os.path.join(latest_dir, "RELIANCE*"))
-    for file in reliance_files:
-        print(f"\nExamining file: {os.path.basename(file)}")
-        df = pd.read_parquet(file)
-        print("\nShape:", df.shape)
-        print("\nIndex:", df.index.tolist()[:5])  # First 5 index values
-        print("\nColumns:", df.columns.tolist())
-        print("\nFirst few rows:")
-        print(df.head())
-        print("\n" + "="*50)
\ No newline at end of file
+    if latest_dir:
+        reliance_files = glob(os.path.join(latest_dir, "RELIANCE*"))
+        for file in reliance_files:
+            print(f"\nExamining file: {os.path.basename(file)}")
+            # Shape comes from the parquet footer; only the first rows are decoded
+            parquet_file = pq.ParquetFile(file)
+            first_batch = next(parquet_file.iter_batches(batch_size=5), None)
+            if first_batch is None:  # Zero-row files yield no batches
+                head = parquet_file.schema_arrow.empty_table().to_pandas()
+            else:
+                head = pa.Table.from_batches([first_batch]).to_pandas()
+            print("\nShape:", (parquet_file.metadata.num_rows, len(head.columns)))
+            print("\nIndex:", head.index.tolist())  # First 5 index values
+            print("\nColumns:", head.columns.tolist())
+            print("\nFirst few rows:")
+            print(head)
+            print("\n" + "="*50)
@@ -1,9 +1,11 @@
 import yfinance as yf
 import pandas as pd
 from typing import List, Optional, Union
-import time
 from datetime import datetime, timedelta
 import logging
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.parquet as pq
 from ratelimit import limits, sleep_and_retry
 
 # Configure logging
@@ -18,6 +20,20 @@ class YahooFinanceCollector:
     # Rate limiting: 2000 calls per hour as per Yahoo Finance API guidelines
     CALLS = 2000
     RATE_LIMIT_PERIOD = 3600  # 1 hour in seconds
+    MAX_WORKERS = 8  # Symbols fetched concurrently by get_nifty50_data
+    
+    # Parquet write settings
+    PARQUET_COMPRESSION_LEVEL = 3  # zstd level
+    PARQUET_DATA_PAGE_SIZE = 1 << 20  # 1 MiB
+    PARQUET_ROW_GROUP_SIZE = 100000  # Rows per row group
+    
+    # Fundamental data type -> yf.Ticker attribute that fetches it
+    FUNDAMENTAL_ATTRIBUTES = {
+        'info': 'info',
+        'balance_sheet': 'balance_sheet',
+        'income_statement': 'income_stmt',
+        'cash_flow': 'cashflow'
+    }
     
     def __init__(self):
         # Nifty 50 companies (you can extend this for BSE/NSE)
@@ -26,15 +42,21 @@ class YahooFinanceCollector:
             "ICICIBANK.NS", "HDFC.NS", "SBIN.NS", "BHARTIARTL.NS", "ITC.NS"
             # Add more symbols as needed
         ]
+        # Ticker objects reused across calls so yfinance can reuse their fetched data
+        self._ticker_cache = {}
     
     @sleep_and_retry
     @limits(calls=CALLS, period=RATE_LIMIT_PERIOD)
     def _fetch_data(self, symbol: str) -> Optional[yf.Ticker]:
         """
         Fetch data for a single symbol with rate limiting.
+        The Ticker is created once per symbol and cached.
         """
         try:
-            return yf.Ticker(symbol)
+            ticker = self._ticker_cache.get(symbol)
+            if ticker is None:
+                ticker = self._ticker_cache.setdefault(symbol, yf.Ticker(symbol))
+            return ticker
         except Exception as e:
             logger.error(f"Error fetching data for {symbol}: {str(e)}")
             return None
@@ -50,18 +72,14 @@ class YahooFinanceCollector:
             if not ticker:
                 return {}
 
-            # Fetch various fundamental data
-            info = ticker.info
-            balance_sheet = ticker.balance_sheet
-            income_stmt = ticker.income_stmt
-            cash_flow = ticker.cashflow
-
-            return {
-                'info': info,
-                'balance_sheet': balance_sheet,
-                'income_statement': income_stmt,
-                'cash_flow': cash_flow
-            }
+            # Fetch various fundamental data; each is a separate Yahoo request,
+            # so they are fetched concurrently
+            with ThreadPoolExecutor(max_workers=len(self.FUNDAMENTAL_ATTRIBUTES)) as executor:
+                futures = {
+                    data_type: executor.submit(getattr, ticker, attribute)
+                    for data_type, attribute in self.FUNDAMENTAL_ATTRIBUTES.items()
+                }
+                return {data_type: future.result() for data_type, future in futures.items()}
         except Exception as e:
             logger.error(f"Error getting fundamental data for {symbol}: {str(e)}")
             return {}
@@ -81,6 +99,32 @@ class YahooFinanceCollector:
             logger.error(f"Error getting historical data for {symbol}: {str(e)}")
             return pd.DataFrame()
 
+    def get_historical_data_batch(self, symbols: List[str], period: str = "max", interval: str = "1d") -> dict:
+        """
+        Get historical price data for several stocks with one batched download.
+        
+        Returns:
+            dict: symbol -> price DataFrame (empty when nothing came back for it)
+        """
+        try:
+            data = yf.download(
+                symbols, period=period, interval=interval, group_by='ticker',
+                actions=True, auto_adjust=True, threads=True, progress=False,
+                ignore_tz=False  # Keep the exchange-local tz-aware index ticker.history() returns
+            )
+        except Exception as e:
+            logger.error(f"Error getting batch historical data for {symbols}: {str(e)}")
+            return {symbol: pd.DataFrame() for symbol in symbols}
+
+        results = {}
+        for symbol in symbols:
+            if symbol in data.columns.get_level_values(0):
+                # Rows before a stock's listing come back all-NaN
+                results[symbol] = data[symbol].dropna(how='all')
+            else:
+                results[symbol] = pd.DataFrame()
+        return results
+
     def get_nifty50_data(self, data_type: str = "fundamental") -> dict:
         """
         Get data for all Nifty 50 stocks.
@@ -88,36 +132,53 @@ class YahooFinanceCollector:
         Args:
             data_type: Either "fundamental" or "historical"
         """
-        results = {}
-        for symbol in self.nifty50_symbols:
+        def fetch(symbol):
             logger.info(f"Fetching {data_type} data for {symbol}")
             
             try:
                 if data_type == "fundamental":
-                    results[symbol] = self.get_fundamental_data(symbol)
-                else:
-                    results[symbol] = self.get_historical_data(symbol)
-                
-                # Add delay to respect rate limits
-                time.sleep(1)
+                    return self.get_fundamental_data(symbol)
+                return self.get_historical_data(symbol)
             except Exception as e:
                 logger.error(f"Error processing {symbol}: {str(e)}")
-                results[symbol] = None
-                
-        return results
+                return None
+        
+        # Rate limits are enforced by _fetch_data's decorators, whose call
+        # counter is shared (and locked) across threads, so no extra delay
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            return dict(zip(self.nifty50_symbols, executor.map(fetch, self.nifty50_symbols)))
 
     def save_data(self, data: Union[dict, pd.DataFrame], filename: str):
         """
         Save data to file (CSV or Parquet).
+        A dict is saved as a single row, one column per key.
         """
         try:
-            if isinstance(data, pd.DataFrame):
-                if filename.endswith('.parquet'):
-                    data.to_parquet(filename)
+            if filename.endswith('.parquet'):
+                # Write through Arrow directly: zstd, delta-encoded timestamps
+                # (e.g. the Date index) and dictionary encoding for everything else
+                if isinstance(data, pd.DataFrame):
+                    table = pa.Table.from_pandas(data, preserve_index=True)
                 else:
-                    data.to_csv(filename)
+                    # A dict payload (e.g. ticker info) is one record: a single-row table
+                    table = pa.Table.from_pylist([data])
+                timestamp_cols = [
+                    field.name for field in table.schema if pa.types.is_timestamp(field.type)
+                ]
+                pq.write_table(
+                    table, filename,
+                    compression='zstd',
+                    compression_level=self.PARQUET_COMPRESSION_LEVEL,
+                    use_dictionary=[name for name in table.column_names if name not in timestamp_cols],
+                    column_encoding={name: 'DELTA_BINARY_PACKED' for name in timestamp_cols},
+                    write_statistics=True,
+                    data_page_size=self.PARQUET_DATA_PAGE_SIZE,
+                    row_group_size=self.PARQUET_ROW_GROUP_SIZE
+                )
             else:
-                pd.DataFrame(data).to_parquet(filename) if filename.endswith('.parquet') else pd.DataFrame(data).to_csv(filename)
+                if not isinstance(data, pd.DataFrame):
+                    data = pd.DataFrame([data])
+                data.to_csv(filename)
             
             logger.info(f"Data successfully saved to {filename}")
         except Exception as e: